@@ -1,19 +1,156 @@
 import os
+import struct
+import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def add_jpg_extension(folder_path):
+# Leading bytes of the formats we expect to find, mapped to their extension
+MAGIC_SIGNATURES = [
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+]
+
+# Sizes of the BMP info headers (BITMAPCOREHEADER ... BITMAPV5HEADER)
+BMP_INFO_HEADER_SIZES = {12, 40, 52, 56, 64, 108, 124}
+
+def _looks_like_bmp(header):
+    """Check the fields after the two-byte "BM" signature"""
+    if len(header) < 18 or not header.startswith(b'BM'):
+        return False
+    reserved, pixel_offset, info_size = struct.unpack('<III', header[6:18])
+    return reserved == 0 and info_size in BMP_INFO_HEADER_SIZES and pixel_offset >= 14 + info_size
+
+def _looks_like_tiff(header, file_size):
+    """Check that the first IFD offset after the byte-order mark is plausible"""
+    if header[:4] == b'II*\x00':
+        offset = struct.unpack('<I', header[4:8])[0]
+    elif header[:4] == b'MM\x00*':
+        offset = struct.unpack('>I', header[4:8])[0]
+    else:
+        return False
+    return 8 <= offset < file_size
+
+def _pillow_accepts(file_path):
+    """Let Pillow confirm a weak signature match, if Pillow is installed"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return True
+    try:
+        with Image.open(file_path) as img:
+            img.verify()
+        return True
+    except Exception:
+        return False
+
+def sniff_extension(file_path):
+    """Return the extension matching the file's real format, or None if it isn't an image."""
+    with open(file_path, 'rb') as f:
+        header = f.read(32)
+
+    # WebP is a RIFF container, so the signature is split around the size field
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return '.webp'
+    for signature, extension in MAGIC_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+
+    # BMP and TIFF signatures are short enough to appear in text files, so
+    # check their header fields and then ask Pillow before trusting them
+    if _looks_like_bmp(header) and _pillow_accepts(file_path):
+        return '.bmp'
+    if _looks_like_tiff(header, os.path.getsize(file_path)) and _pillow_accepts(file_path):
+        return '.tif'
+    return None
+
+def transcode_to_jpg(file_path, quality=90):
+    """Convert an image to JPEG next to the original and remove the original."""
+    # Imported here so the plain renaming mode works without Pillow
+    from PIL import Image
+
+    source = Path(file_path)
+    target = source.with_suffix('.jpg')
+    if target.exists():
+        raise FileExistsError(f"{target.name} already exists")
+
+    tmp_target = target.with_name(f".{target.name}.tmp")
+    try:
+        with Image.open(source) as img:
+            if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+                # JPEG has no alpha, so flatten transparent areas onto white
+                img = img.convert('RGBA')
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel('A'))
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+            img.save(tmp_target, 'JPEG', quality=quality, optimize=True)
+        os.replace(tmp_target, target)
+    finally:
+        if tmp_target.exists():
+            tmp_target.unlink()
+    source.unlink()
+    return str(target)
+
+def add_jpg_extension(folder_path, transcode=False, quality=90, workers=None):
+    """Give extensionless files the extension of their real format.
+
+    With transcode=True, every non-JPEG image in the folder (whether it had an
+    extension or not) is also converted to JPEG in a process pool.
+    """
     folder = Path(folder_path)
-    
+
     if not folder.exists() or not folder.is_dir():
         print(f"The folder {folder_path} does not exist or is not a directory.")
         return
-    
-    for file_path in folder.iterdir():
-        if file_path.is_file() and file_path.suffix == '':
-            new_file_path = file_path.with_suffix('.jpg')
+
+    # Take the listing up front: we rename files in this folder as we go, and
+    # a renamed entry could otherwise be returned (and queued) a second time
+    with os.scandir(folder) as entries:
+        files = [Path(entry.path) for entry in entries if entry.is_file()]
+
+    to_transcode = []
+    for file_path in files:
+        if file_path.suffix == '':
+            extension = sniff_extension(file_path)
+            if extension is None:
+                print(f"Skipping non-image file: {file_path.name}")
+                continue
+            new_file_path = file_path.with_suffix(extension)
+            if new_file_path.exists():
+                print(f"Skipping {file_path.name}: {new_file_path.name} already exists")
+                continue
             file_path.rename(new_file_path)
             print(f"Renamed: {file_path.name} to {new_file_path.name}")
+            file_path = new_file_path
+
+        if transcode and file_path.suffix.lower() in ('.png', '.webp', '.gif', '.bmp', '.tif', '.tiff'):
+            if sniff_extension(file_path) is not None:
+                to_transcode.append(file_path)
+
+    if not to_transcode:
+        return
+
+    total = len(to_transcode)
+    print(f"Transcoding {total} images to JPEG (quality {quality})...")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(transcode_to_jpg, str(path), quality): path for path in to_transcode}
+        for done, future in enumerate(as_completed(futures), start=1):
+            path = futures[future]
+            try:
+                target = future.result()
+                print(f"[{done}/{total}] Converted: {path.name} to {Path(target).name}")
+            except Exception as e:
+                print(f"[{done}/{total}] Failed to convert {path.name}: {e}")
 
 if __name__ == "__main__":
-    folder_path = "C:/Users/tervi/Spotlight"
-    add_jpg_extension(folder_path)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Fix image file extensions in a folder")
+    parser.add_argument("folder", nargs="?", default="C:/Users/tervi/Spotlight")
+    parser.add_argument("--transcode", action="store_true", help="convert non-JPEG images to JPEG")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG quality used when transcoding")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    args = parser.parse_args()
+
+    add_jpg_extension(args.folder, transcode=args.transcode, quality=args.quality, workers=args.workers)
@@ -1,34 +1,138 @@
 import os
 import shutil
+import argparse
+import tempfile
 from pathlib import Path
 from PIL import Image
 import hashlib
 
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl, so reflinks are unavailable there
+    fcntl = None
+
+# ioctl request number for FICLONE (Linux reflink on btrfs, XFS, ...)
+FICLONE = 0x40049409
+
 def calculate_hash(file_path):
     """Calculate the SHA-256 hash of the file."""
     hash_sha256 = hashlib.sha256()
     with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b""):
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
             hash_sha256.update(chunk)
     return hash_sha256.hexdigest()
 
-def copy_spotlight_images():
+def spotlight_filename(file_hash):
+    """Content-addressed destination name for an image with the given hash."""
+    return f"spotlight_{file_hash[:16]}.jpg"
+
+def hash_from_filename(file_path):
+    """Return the hash prefix encoded in a content-addressed name, or None."""
+    stem = Path(file_path).stem
+    prefix = stem[len("spotlight_"):]
+    if stem.startswith("spotlight_") and len(prefix) == 16 and all(c in "0123456789abcdef" for c in prefix):
+        return prefix
+    return None
+
+def _fast_copy(src, dst):
+    """Try to copy between open files without moving bytes through Python.
+
+    Tries a reflink (FICLONE) and then os.copy_file_range. Returns the name
+    of the method that succeeded, or None if neither is available.
+    """
+    if fcntl is not None:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return "reflink"
+        except OSError:
+            pass
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            remaining = os.fstat(src.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+            if remaining == 0:
+                return "copy_file_range"
+        except OSError:
+            pass
+        # Leave an empty file for the caller to start over with
+        dst.seek(0)
+        dst.truncate()
+    return None
+
+def _clone_file(source, target, allow_hardlink=False):
+    """Write source into the (new) target path without copying bytes if possible.
+
+    Tries, in order: a reflink, os.copy_file_range, a hardlink (only when
+    allow_hardlink is set) and finally a plain copy. Hardlinks are opt-in
+    because the link shares the source's inode, so if Windows rewrites the
+    asset in place our content-addressed copy changes with it.
+    Returns the name of the method that succeeded.
+    """
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        method = _fast_copy(src, dst)
+    if method is not None:
+        shutil.copystat(source, target)
+        return method
+
+    if allow_hardlink:
+        try:
+            os.unlink(target)
+            os.link(source, target)
+            return "hardlink"
+        except OSError:
+            pass
+
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    shutil.copystat(source, target)
+    return "copy"
+
+def place_file(source, dest_file, allow_hardlink=False):
+    """Atomically place a copy of source at dest_file.
+
+    The data is first written to a temporary name in the destination directory
+    and then moved into place, so a crash never leaves a half-written image and
+    an existing file is never clobbered by different content.
+    """
+    fd, tmp_name = tempfile.mkstemp(prefix=".spotlight_", suffix=".tmp", dir=dest_file.parent)
+    os.close(fd)
+    os.unlink(tmp_name)
+    try:
+        method = _clone_file(source, tmp_name, allow_hardlink)
+        os.replace(tmp_name, dest_file)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return method
+
+def copy_spotlight_images(allow_hardlink=False):
     username = os.getlogin()
     source_dir = Path(os.environ['LOCALAPPDATA']) / 'Packages' / 'Microsoft.Windows.ContentDeliveryManager_cw5n1h2txyewy' / 'LocalState' / 'Assets'
     dest_dir = Path(f"C:/Users/{username}/Dropbox/Eltomalturta/myndasyning/Spotlight")
-    
+
     # Create destination directory if it doesn't exist
     dest_dir.mkdir(exist_ok=True)
     print(f"Destination directory: {dest_dir}")
-    
-    # Get existing hashes in the destination directory
+
+    # Get existing hashes in the destination directory. Content-addressed
+    # files carry their hash in the name; only legacy files need hashing.
     existing_hashes = set()
     for file_path in dest_dir.glob("*.jpg"):
-        existing_hashes.add(calculate_hash(file_path))
-    
+        name_hash = hash_from_filename(file_path)
+        if name_hash is not None:
+            existing_hashes.add(name_hash)
+        else:
+            existing_hashes.add(calculate_hash(file_path)[:16])
+
     # Counter for copied files
-    copy_count = len(existing_hashes)
-    
+    copy_count = 0
+
     # Process each file in the source directory
     for file_path in source_dir.iterdir():
         if file_path.is_file():
@@ -36,27 +140,38 @@ def copy_spotlight_images():
                 # Try to open the file as an image
                 with Image.open(file_path) as img:
                     width, height = img.size
-                    
-                    # Check if image meets our criteria (landscape and minimum size)
-                    if width > 1000 and height > 500 and width > height:
-                        # Calculate the hash of the source file
-                        file_hash = calculate_hash(file_path)
-                        
-                        # Only copy if the file hash is not in the existing hashes
-                        if file_hash not in existing_hashes:
-                            # Create destination filename with sequential numbering
-                            dest_file = dest_dir / f"spotlight_{copy_count + 1}.jpg"
-                            shutil.copy2(file_path, dest_file)
-                            existing_hashes.add(file_hash)
-                            copy_count += 1
-                            print(f"Copied: {dest_file.name}")
-                            
+
+                # Check if image meets our criteria (landscape and minimum size)
+                if width > 1000 and height > 500 and width > height:
+                    # Calculate the hash of the source file
+                    file_hash = calculate_hash(file_path)
+
+                    # Only copy if the file hash is not in the existing hashes
+                    if file_hash[:16] not in existing_hashes:
+                        # Name the destination after its content so it can never collide
+                        dest_file = dest_dir / spotlight_filename(file_hash)
+                        try:
+                            method = place_file(file_path, dest_file, allow_hardlink)
+                        except OSError as e:
+                            # A real failure (disk full, access denied, ...), not a bad image
+                            print(f"Error copying {file_path.name} to {dest_file.name}: {e}")
+                            continue
+                        existing_hashes.add(file_hash[:16])
+                        copy_count += 1
+                        print(f"Copied: {dest_file.name} ({method})")
+
             except Exception as e:
                 # Skip files that aren't valid images
                 print(f"Skipping non-image file: {file_path.name}")
                 continue
-    
-    print(f"\nProcess completed. Copied {copy_count - len(existing_hashes)} new images to {dest_dir}")
+
+    print(f"\nProcess completed. Copied {copy_count} new images to {dest_dir}")
 
 if __name__ == "__main__":
-    copy_spotlight_images()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Copy Windows Spotlight images")
+    parser.add_argument("--hardlink", action="store_true",
+                        help="hardlink instead of copying when nothing cheaper works (the copy then "
+                             "changes if Windows rewrites the original)")
+    args = parser.parse_args()
+
+    copy_spotlight_images(allow_hardlink=args.hardlink)
@@ -0,0 +1,202 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+import numpy as np
+from PIL import Image
+
+# Images are reduced to this size before extracting features
+THUMBNAIL_SIZE = (64, 64)
+HUE_BINS = 12
+
+# Column layout of the feature matrix
+BRIGHTNESS = 0
+CONTRAST = 1
+SATURATION = 2
+HUE_START = 3
+FEATURE_COUNT = HUE_START + HUE_BINS
+
+# Bump when the meaning of the features changes, so old indexes are rebuilt
+INDEX_VERSION = 2
+
+def extract_features(image_path):
+    """Compute brightness, contrast, saturation and a hue histogram for one image."""
+    with Image.open(image_path) as img:
+        # Decode JPEGs at reduced scale; we only need a thumbnail
+        img.draft('RGB', (THUMBNAIL_SIZE[0] * 2, THUMBNAIL_SIZE[1] * 2))
+        img = img.convert('RGB')
+        img.thumbnail(THUMBNAIL_SIZE)
+        hsv = np.asarray(img.convert('HSV'), dtype=np.float32) / 255.0
+        rgb = np.asarray(img, dtype=np.float32) / 255.0
+
+    luma = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    hue, sat, val = hsv[..., 0].ravel(), hsv[..., 1].ravel(), hsv[..., 2].ravel()
+
+    # Weight hues by how colourful the pixel is, so greys don't count
+    weights = sat * val
+    # Centre the first bin on hue 0 so reds don't straddle bins 0 and 11
+    hue = (hue + 0.5 / HUE_BINS) % 1.0
+    hist, _ = np.histogram(hue, bins=HUE_BINS, range=(0.0, 1.0), weights=weights)
+    total = hist.sum()
+    if total > 0:
+        hist = hist / total
+
+    features = np.empty(FEATURE_COUNT, dtype=np.float32)
+    features[BRIGHTNESS] = luma.mean()
+    features[CONTRAST] = luma.std()
+    features[SATURATION] = sat.mean()
+    features[HUE_START:] = hist
+    return features
+
+class FeatureIndex:
+    """Array-backed index of image features for a set of wallpaper folders."""
+
+    def __init__(self, index_path="feature_index.npz"):
+        self.index_path = Path(index_path)
+        self.lock = threading.Lock()
+        self.paths = []
+        self.sizes = np.zeros(0, dtype=np.int64)
+        self.mtimes = np.zeros(0, dtype=np.int64)
+        self.features = np.zeros((0, FEATURE_COUNT), dtype=np.float32)
+        self.load()
+
+    def __len__(self):
+        with self.lock:
+            return len(self.paths)
+
+    def load(self):
+        """Load the index from disk, if present and compatible"""
+        if not self.index_path.exists():
+            return
+        try:
+            with np.load(self.index_path) as data:
+                if 'version' not in data or int(data['version']) != INDEX_VERSION:
+                    return
+                paths = [str(p) for p in data['paths']]
+                sizes, mtimes, features = data['sizes'], data['mtimes'], data['features']
+        except Exception:
+            # A damaged index is simply rebuilt on the next update
+            return
+        if features.ndim != 2 or features.shape[1] != FEATURE_COUNT:
+            return
+        self.paths, self.sizes, self.mtimes, self.features = paths, sizes, mtimes, features
+
+    def save(self):
+        """Write the index to disk atomically"""
+        with self.lock:
+            self._save()
+
+    def _save(self):
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self.index_path.stem}_", suffix=".tmp.npz",
+                                        dir=self.index_path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    version=np.array(INDEX_VERSION),
+                    paths=np.array(self.paths, dtype=str),
+                    sizes=self.sizes,
+                    mtimes=self.mtimes,
+                    features=self.features,
+                )
+            os.replace(tmp_path, self.index_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def update(self, folders, pattern="*.jpg"):
+        """Bring the index in line with the images currently in the folders.
+
+        Unchanged files (same size and mtime) keep their features; new or
+        modified files are analysed and deleted files are dropped.
+        Returns the number of newly analysed images.
+        """
+        # Held throughout so concurrent updates don't analyse or save twice
+        with self.lock:
+            return self._update(folders, pattern)
+
+    def _update(self, folders, pattern):
+        known = {path: i for i, path in enumerate(self.paths)}
+        paths, sizes, mtimes, rows = [], [], [], []
+        analysed = 0
+
+        seen = set()
+        for folder in folders:
+            for file_path in Path(folder).glob(pattern):
+                path = str(file_path.resolve())
+                if path in seen:
+                    continue
+                seen.add(path)
+
+                stat = file_path.stat()
+                i = known.get(path)
+                if i is not None and self.sizes[i] == stat.st_size and self.mtimes[i] == stat.st_mtime_ns:
+                    row = self.features[i]
+                else:
+                    try:
+                        row = extract_features(file_path)
+                    except Exception:
+                        continue
+                    analysed += 1
+
+                paths.append(path)
+                sizes.append(stat.st_size)
+                mtimes.append(stat.st_mtime_ns)
+                rows.append(row)
+
+        changed = analysed > 0 or len(paths) != len(self.paths)
+        self.paths = paths
+        self.sizes = np.array(sizes, dtype=np.int64)
+        self.mtimes = np.array(mtimes, dtype=np.int64)
+        self.features = np.array(rows, dtype=np.float32).reshape(-1, FEATURE_COUNT)
+        if changed:
+            self._save()
+        return analysed
+
+    def filter(self, min_brightness=0.0, max_brightness=1.0, hue=None, min_hue_share=0.25):
+        """Return paths of images within a brightness range and, optionally,
+        with at least min_hue_share of their colour in the given hue (0-1)."""
+        with self.lock:
+            paths, features = self.paths, self.features
+
+        brightness = features[:, BRIGHTNESS]
+        mask = (brightness >= min_brightness) & (brightness <= max_brightness)
+        if hue is not None:
+            # Same half-bin shift as extract_features
+            hue_bin = int(((hue + 0.5 / HUE_BINS) % 1.0) * HUE_BINS) % HUE_BINS
+            mask &= features[:, HUE_START + hue_bin] >= min_hue_share
+        return [paths[i] for i in np.flatnonzero(mask)]
+
+    def nearest(self, image_path, k=5):
+        """Return up to k paths of the images most similar to image_path"""
+        with self.lock:
+            paths, features = self.paths, self.features
+        if not paths:
+            return []
+        path = str(Path(image_path).resolve())
+        try:
+            i = paths.index(path)
+            target = features[i]
+        except ValueError:
+            i = None
+            target = extract_features(image_path)
+
+        # Standardise each feature block over the library, so brightness,
+        # contrast, saturation and the hue histogram weigh the same. The hue
+        # bins share one scale (per-bin scaling would blow up rare hues) and
+        # are down-weighted to count as a single feature rather than twelve.
+        spread = features.std(axis=0)
+        scale = np.empty(FEATURE_COUNT, dtype=np.float32)
+        scale[:HUE_START] = spread[:HUE_START]
+        scale[HUE_START:] = np.sqrt(np.mean(spread[HUE_START:] ** 2)) * np.sqrt(HUE_BINS)
+        scale[scale == 0] = 1.0
+        distances = np.linalg.norm((features - target) / scale, axis=1)
+        if i is not None:
+            distances[i] = np.inf
+        k = min(k, len(distances) - (i is not None))
+        if k <= 0:
+            return []
+        closest = np.argpartition(distances, k - 1)[:k]
+        closest = closest[np.argsort(distances[closest])]
+        return [paths[j] for j in closest]
@@ -1,4 +1,6 @@
 import os
+import hashlib
+import tempfile
 import requests
 import ctypes
 import time
@@ -7,7 +9,11 @@ import threading
 import keyboard
 from pathlib import Path
 from datetime import datetime
-from PIL import Image, ImageTk
+from PIL import Image, ImageTk, ImageOps
+from copy_spotlight import calculate_hash
+from image_features import FeatureIndex
+from pexels_budget import RequestBudget
+from seen_set import SeenSet
 import tkinter as tk
 from tkinter import ttk
 from pystray import Icon, Menu, MenuItem
@@ -189,6 +195,7 @@ class WallpaperSlideshow:
         self.logger = logging.getLogger(__name__)
         
         self.pexels_api_key = pexels_api_key
+        self.pexels_api_url = "https://api.pexels.com/v1/search"
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(exist_ok=True)
         
@@ -200,6 +207,26 @@ class WallpaperSlideshow:
         self.spotlight_dir = Path("Spotlight")
         self.spotlight_dir.mkdir(parents=True, exist_ok=True)
 
+        # Screen-sized renders of the images we set, keyed by content hash and resolution
+        self.render_cache_dir = Path("render_cache")
+        self.render_cache_dir.mkdir(exist_ok=True)
+        self.render_mode = "fill"  # "fill" crops to the screen, "fit" letterboxes
+        self._hash_cache = {}
+
+        # Colour/brightness features of the local library, for mood-based selection
+        self.feature_index = FeatureIndex("feature_index.npz")
+        self.mood_rotation = False  # Pick local images matching the time of day
+        self.index_thread = None  # Background refresh of the feature index
+
+        # Pexels API quota, shared between interactive and background requests
+        self.request_budget = RequestBudget("pexels_budget.json")
+
+        # Pexels photo IDs and content hashes we have already downloaded
+        self.seen_photos = SeenSet("seen_set.bin")
+        self.query_totals = {}  # Result count of each search query, to pick valid pages
+        self.seen_pages = {}  # Pages of each query on which every photo was already shown
+        self.pending_seen = {}  # Keys of downloads not yet applied, recorded once they are
+
         # Windows API constant for setting wallpaper
         self.SPI_SETDESKWALLPAPER = 0x0014
         self.SPIF_UPDATEINIFILE = 0x01
@@ -210,12 +237,14 @@ class WallpaperSlideshow:
         self.timer_active = True
         self.current_wallpaper = None
         self.drag_data = {"x": 0, "y": 0}
+        self.status_timer = None  # Pending Tk "after" job that resets the status label
 
         # Add search keywords tracking
         self.current_search_query = "nature"  # Default query
 
         # Initialize UI elements
         self.button_window = None
+        self.ui_thread = threading.current_thread()  # The thread that owns the Tk window
         self.icon = None
         self.init_ui()
 
@@ -418,7 +447,7 @@ class WallpaperSlideshow:
                     self.toggle_timer()  # This will pause the timer
                 
                 self.update_status("Spotlight wallpaper set!", '#4CAF50')
-                threading.Timer(3, lambda: self.update_status("Ready")).start()
+                self.reset_status_later()
                 
                 self.logger.info(f"Loaded Spotlight wallpaper: {filepath}")
             else:
@@ -445,7 +474,7 @@ class WallpaperSlideshow:
             )
             self.update_status("Timer paused", '#FF9800')
         
-        threading.Timer(3, lambda: self.update_status("Ready")).start()
+        self.reset_status_later()
 
     def save_to_favorites(self):
         """Save the current wallpaper to favorites folder"""
@@ -469,7 +498,7 @@ class WallpaperSlideshow:
             shutil.copy2(source_path, target_path)
             
             self.update_status("Saved to favorites!", '#4CAF50')
-            threading.Timer(3, lambda: self.update_status("Ready")).start()
+            self.reset_status_later()
             
             self.logger.info(f"Saved wallpaper to favorites: {target_path}")
             
@@ -502,7 +531,7 @@ class WallpaperSlideshow:
                     self.toggle_timer()  # This will pause the timer
                 
                 self.update_status("Favorite wallpaper set!", '#4CAF50')
-                threading.Timer(3, lambda: self.update_status("Ready")).start()
+                self.reset_status_later()
                 
                 self.logger.info(f"Loaded favorite wallpaper: {filepath}")
             else:
@@ -526,6 +555,9 @@ class WallpaperSlideshow:
         try:
             menu = Menu(
                 MenuItem("New Wallpaper (Ctrl+Alt+N)", self.force_new_wallpaper),
+                MenuItem("More Like Current", self.more_like_current),
+                MenuItem("Match Time of Day", self.toggle_mood_rotation,
+                         checked=lambda item: self.mood_rotation),
                 MenuItem("Show/Hide Button", self.toggle_button),
                 MenuItem("Exit", self.quit_app)
             )
@@ -553,9 +585,30 @@ class WallpaperSlideshow:
 
     def update_status(self, message, color='#aaaaaa'):
         """Update the status label with a message"""
-        if hasattr(self, 'status_label'):
-            self.status_label.config(text=message, fg=color)
-            self.button_window.update()
+        if self.button_window is None or not hasattr(self, 'status_label'):
+            return
+        if threading.current_thread() is not self.ui_thread:
+            # Tk may only be used from its own thread; let the main loop do it
+            self.button_window.after(0, self.update_status, message, color)
+            return
+        self.status_label.config(text=message, fg=color)
+        self.button_window.update_idletasks()
+
+    def reset_status_later(self, delay=3):
+        """Reset the status label to "Ready" after a delay, replacing any pending reset"""
+        if self.button_window is None:
+            return
+        if threading.current_thread() is not self.ui_thread:
+            self.button_window.after(0, self.reset_status_later, delay)
+            return
+        if self.status_timer is not None:
+            self.button_window.after_cancel(self.status_timer)
+        self.status_timer = self.button_window.after(int(delay * 1000), self.reset_status)
+
+    def reset_status(self):
+        """Show "Ready" in the status label"""
+        self.status_timer = None
+        self.update_status("Ready")
 
     def toggle_button(self):
         """Toggle the floating button visibility"""
@@ -564,18 +617,34 @@ class WallpaperSlideshow:
         else:
             self.button_window.deiconify()
 
-    def force_new_wallpaper(self, *args):
+    def force_new_wallpaper(self, *args, background=False):
         """Force download and set a new wallpaper"""
         try:
-            self.update_status("Downloading new image...", '#2196F3')
-            image_path = self.download_image()
+            image_path = None
+            if self.mood_rotation:
+                image_path = self.pick_by_time_of_day()
+
+            if not image_path:
+                self.update_status("Downloading new image...", '#2196F3')
+                image_path = self.download_image(background=background)
+
+            if not image_path:
+                # Out of quota or offline: fall back to the local library.
+                # A time-of-day match was already tried above.
+                image_path = self.pick_local_wallpaper(match_time_of_day=False)
+                if image_path:
+                    self.update_status("Using local image", '#FF9800')
             
             if image_path:
                 self.update_status("Setting wallpaper...", '#2196F3')
+                # Only a download that made it onto the desktop counts as shown,
+                # so a failed apply doesn't use up the photo
+                seen_keys = self.pending_seen.pop(image_path, [])
                 self.set_wallpaper(image_path)
+                self.mark_seen(*seen_keys)
                 self.cleanup_old_wallpapers()
                 self.update_status("Wallpaper updated!", '#4CAF50')
-                threading.Timer(3, lambda: self.update_status("Ready")).start()
+                self.reset_status_later()
             else:
                 self.update_status("Failed to download image", '#f44336')
                 
@@ -583,6 +652,116 @@ class WallpaperSlideshow:
             self.logger.error(f"Error in force_new_wallpaper: {e}")
             self.update_status("Error changing wallpaper", '#f44336')
 
+    def refresh_feature_index(self):
+        """Analyse any new images in the local library folders"""
+        folders = {self.download_dir.resolve(), self.favorites_dir.resolve(), self.spotlight_dir.resolve()}
+        analysed = self.feature_index.update(sorted(folders))
+        if analysed:
+            self.logger.info(f"Indexed {analysed} new images ({len(self.feature_index)} total)")
+
+    def refresh_feature_index_in_background(self):
+        """Refresh the feature index on a worker thread, unless one is already running"""
+        if self.index_thread is not None and self.index_thread.is_alive():
+            return
+
+        def refresh():
+            try:
+                self.refresh_feature_index()
+            except Exception as e:
+                self.logger.error(f"Error refreshing feature index: {e}")
+
+        self.index_thread = threading.Thread(target=refresh, daemon=True)
+        self.index_thread.start()
+
+    def pick_local_wallpaper(self, match_time_of_day=None):
+        """Pick a random image from favorites or Spotlight
+
+        When match_time_of_day is set (by default, when mood rotation is on),
+        images suiting the current hour are tried first.
+        """
+        if match_time_of_day is None:
+            match_time_of_day = self.mood_rotation
+        if match_time_of_day:
+            image_path = self.pick_by_time_of_day()
+            if image_path:
+                return image_path
+
+        current = str(Path(self.current_wallpaper).resolve()) if self.current_wallpaper else None
+        candidates = [str(path.resolve())
+                      for folder in (self.favorites_dir, self.spotlight_dir)
+                      for path in folder.glob("*.jpg")
+                      if not self.is_temporary_download(path)]
+        candidates = [path for path in set(candidates) if path != current]
+        if not candidates:
+            return None
+
+        image_path = random.choice(candidates)
+        self.current_wallpaper = image_path
+        return image_path
+
+    def is_temporary_download(self, image_path):
+        """Downloads are removed by cleanup_old_wallpapers, so don't pick them"""
+        return Path(image_path).name.startswith("wallpaper_")
+
+    def pick_by_time_of_day(self):
+        """Pick a local image whose brightness suits the current time of day
+
+        Uses the index as it stands; it is refreshed off the UI thread.
+        """
+        try:
+            hour = datetime.now().hour
+            if hour >= 20 or hour < 7:
+                candidates = self.feature_index.filter(max_brightness=0.35)
+            elif 10 <= hour < 17:
+                candidates = self.feature_index.filter(min_brightness=0.45)
+            else:
+                candidates = self.feature_index.filter(min_brightness=0.25, max_brightness=0.6)
+
+            current = str(Path(self.current_wallpaper).resolve()) if self.current_wallpaper else None
+            candidates = [path for path in candidates
+                          if path != current and not self.is_temporary_download(path)]
+            if not candidates:
+                return None
+
+            image_path = random.choice(candidates)
+            self.current_wallpaper = image_path
+            return image_path
+        except Exception as e:
+            self.logger.error(f"Error picking wallpaper by time of day: {e}")
+            return None
+
+    def more_like_current(self, *args):
+        """Set a local image similar to the current wallpaper"""
+        try:
+            if not self.current_wallpaper or not Path(self.current_wallpaper).exists():
+                self.update_status("No wallpaper to compare", '#f44336')
+                return
+
+            similar = [path for path in self.feature_index.nearest(self.current_wallpaper, k=15)
+                       if not self.is_temporary_download(path)][:5]
+            if not similar:
+                self.update_status("No similar images found", '#FF9800')
+                return
+
+            image_path = random.choice(similar)
+            self.set_wallpaper(image_path)
+            self.current_wallpaper = image_path
+            self.update_status("Similar wallpaper set!", '#4CAF50')
+            self.reset_status_later()
+        except Exception as e:
+            self.logger.error(f"Error finding similar wallpaper: {e}")
+            self.update_status("Error finding similar image", '#f44336')
+
+    def toggle_mood_rotation(self, *args):
+        """Toggle picking local wallpapers that match the time of day"""
+        self.mood_rotation = not self.mood_rotation
+        if self.mood_rotation:
+            self.refresh_feature_index_in_background()
+            self.update_status("Matching time of day", '#4CAF50')
+        else:
+            self.update_status("Downloading new images", '#4CAF50')
+        self.reset_status_later()
+
     def open_keyword_dialog(self):
         """Open the keyword selection dialog"""
         dialog = KeywordSelectionDialog(self.button_window)
@@ -593,14 +772,14 @@ class WallpaperSlideshow:
         if keywords:
             self.current_search_query = keywords
             self.update_status(f"Search keywords updated: {keywords}", '#4CAF50')
-            threading.Timer(3, lambda: self.update_status("Ready")).start()
+            self.reset_status_later()
 
 
-    def download_image(self, query=None):
+    def download_image(self, query=None, background=False, max_pages=3):
         """Download a random image from Pexels based on query"""
         try:
             # Pexels API endpoint
-            base_url = "https://api.pexels.com/v1/search"
+            base_url = self.pexels_api_url
             
             search_query = query or self.current_search_query
 
@@ -608,43 +787,67 @@ class WallpaperSlideshow:
             headers = {
                 'Authorization': self.pexels_api_key
             }
-            params = {
-                'query': search_query,
-                'per_page': 1,
-                'page': random.randint(1, 1000)  # Random page to get a random image
-            }
-            
-            # Get image list
-            response = requests.get(base_url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if not data.get('photos', []):
-                self.logger.error("No images found for the query")
-                return None
-            
-            # Choose the first image from the results
-            photo = data['photos'][0]
-            
-            # Get the URL of the image
-            image_url = photo['src']['original']
-            photographer = photo.get('photographer', 'Unknown')
-            
-            # Download the image
-            image_response = requests.get(image_url)
-            image_response.raise_for_status()
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"wallpaper_{timestamp}.jpg"
-            filepath = self.download_dir / filename
-            
-            with open(filepath, 'wb') as f:
-                f.write(image_response.content)
-            
-            self.logger.info(f"Downloaded image by {photographer}")
-            self.current_wallpaper = str(filepath)
-            return str(filepath)
+            # A full page costs the same single request, and gives us
+            # alternatives when the first photo has been seen before
+            per_page = 15
+
+            # Try a few pages before giving up, in case a page was all seen
+            for attempt in range(max_pages):
+                # Background fetches are paced to the API quota; the user gets priority
+                if not self.request_budget.allow(interactive=not background):
+                    self.logger.info(f"Skipping Pexels request to save quota ({self.request_budget.status()})")
+                    return None
+
+                # Draw the page from the real result count once we know it,
+                # skipping pages we already know hold nothing new
+                total_results = self.query_totals.get(search_query, 1000)
+                page_count = max(1, -(-total_results // per_page))
+                seen_pages = self.seen_pages.setdefault(search_query, set())
+                if sum(1 for seen_page in seen_pages if seen_page <= page_count) >= page_count:
+                    self.logger.info(f"Every image for '{search_query}' has been shown before")
+                    return None
+                page = random.randint(1, page_count)  # Random page to get a random image
+                while page in seen_pages:
+                    page = random.randint(1, page_count)
+                params = {
+                    'query': search_query,
+                    'per_page': per_page,
+                    'page': page
+                }
+
+                # Get image list
+                response = requests.get(base_url, headers=headers, params=params)
+                self.request_budget.record(response, interactive=not background)
+                response.raise_for_status()
+
+                data = response.json()
+                if 'total_results' in data:
+                    self.query_totals[search_query] = data['total_results']
+                    if data['total_results'] == 0:
+                        self.logger.error("No images found for the query")
+                        return None
+
+                # Choose the first image from the results we haven't shown before
+                for photo in data.get('photos', []):
+                    photo_key = f"pexels:{photo['id']}"
+                    if photo_key in self.seen_photos:
+                        continue
+
+                    filepath, content_key = self.download_photo(photo)
+                    if filepath is None:
+                        # Same content under another ID: no need to fetch it again
+                        self.mark_seen(photo_key)
+                        continue
+
+                    self.pending_seen[str(filepath)] = [photo_key, content_key]
+                    self.current_wallpaper = str(filepath)
+                    return str(filepath)
+
+                if data.get('photos'):
+                    self.logger.info(f"All images on page {page} have been shown before")
+                    seen_pages.add(page)
+
+            return None
             
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Download error: {e}")
@@ -653,27 +856,173 @@ class WallpaperSlideshow:
             self.logger.error(f"Unexpected error in download_image: {e}")
             return None
 
+    def mark_seen(self, *keys):
+        """Remember photo IDs or content hashes as shown"""
+        if not keys:
+            return
+        for key in keys:
+            self.seen_photos.add(key)
+        try:
+            self.seen_photos.save()
+        except OSError as e:
+            self.logger.error(f"Error saving seen photos: {e}")
+
+    def download_photo(self, photo):
+        """Download a Pexels photo and return (path, content key).
+
+        The path is None if the same content was shown before.
+        """
+        # Get the URL of the image
+        image_url = photo['src']['original']
+        photographer = photo.get('photographer', 'Unknown')
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = self.download_dir / f"wallpaper_{timestamp}_{photo['id']}.jpg"
+
+        # Stream the image to a unique temporary file, hashing it on the way,
+        # so concurrent downloads never write to or move each other's file
+        fd, tmp_path = tempfile.mkstemp(prefix=".wallpaper_", suffix=".tmp", dir=self.download_dir)
+        hash_sha256 = hashlib.sha256()
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                with requests.get(image_url, stream=True, timeout=60) as image_response:
+                    image_response.raise_for_status()
+                    for chunk in image_response.iter_content(chunk_size=1024 * 1024):
+                        hash_sha256.update(chunk)
+                        f.write(chunk)
+
+            content_key = f"sha256:{hash_sha256.hexdigest()}"
+            if content_key in self.seen_photos:
+                self.logger.info(f"Skipping already shown image by {photographer}")
+                return None, content_key
+
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        self.logger.info(f"Downloaded image by {photographer}")
+        return filepath, content_key
+
+    def get_screen_size(self):
+        """Return the primary screen resolution in physical pixels as (width, height)"""
+        try:
+            # GetSystemMetrics reports DPI-scaled sizes for a process that is
+            # not DPI aware, so ask the device context for the real resolution
+            DESKTOPVERTRES = 117
+            DESKTOPHORZRES = 118
+            hdc = ctypes.windll.user32.GetDC(0)
+            try:
+                width = ctypes.windll.gdi32.GetDeviceCaps(hdc, DESKTOPHORZRES)
+                height = ctypes.windll.gdi32.GetDeviceCaps(hdc, DESKTOPVERTRES)
+            finally:
+                ctypes.windll.user32.ReleaseDC(0, hdc)
+            if width and height:
+                return width, height
+        except Exception:
+            pass
+        return self.button_window.winfo_screenwidth(), self.button_window.winfo_screenheight()
+
+    def get_image_hash(self, image_path):
+        """Return the content hash of an image, cached by path, size and mtime"""
+        stat = os.stat(image_path)
+        key = (str(image_path), stat.st_size, stat.st_mtime_ns)
+        file_hash = self._hash_cache.get(key)
+        if file_hash is None:
+            # Another thread may clear the memo at any time, so return our own copy
+            file_hash = calculate_hash(image_path)
+            if len(self._hash_cache) > 256:
+                self._hash_cache.clear()
+            self._hash_cache[key] = file_hash
+        return file_hash
+
+    def render_for_screen(self, image_path):
+        """Return a copy of the image scaled to the screen, rendering it if not cached"""
+        width, height = self.get_screen_size()
+        file_hash = self.get_image_hash(image_path)
+        render_path = self.render_cache_dir / f"{file_hash[:16]}_{width}x{height}_{self.render_mode}.jpg"
+
+        if render_path.exists():
+            # Mark as recently used so cleanup keeps it
+            os.utime(render_path)
+            return str(render_path)
+
+        with Image.open(image_path) as img:
+            # Work in the orientation the photo is meant to be viewed in
+            stored_width, stored_height = img.size
+            if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+                src_width, src_height = stored_height, stored_width
+            else:
+                src_width, src_height = stored_width, stored_height
+
+            if self.render_mode == "fit":
+                scale = min(width / src_width, height / src_height)
+            else:
+                scale = max(width / src_width, height / src_height)
+
+            # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while decoding
+            img.draft('RGB', (int(stored_width * scale) + 1, int(stored_height * scale) + 1))
+            img = ImageOps.exif_transpose(img)
+            draft_scale = img.size[0] / src_width
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            if self.render_mode == "fit":
+                size = (max(1, round(src_width * scale)), max(1, round(src_height * scale)))
+                resized = img.resize(size, Image.LANCZOS, reducing_gap=3.0)
+                rendered = Image.new('RGB', (width, height))
+                rendered.paste(resized, ((width - size[0]) // 2, (height - size[1]) // 2))
+            else:
+                # Crop the centre region matching the screen's aspect ratio
+                crop_width = width / scale * draft_scale
+                crop_height = height / scale * draft_scale
+                left = (img.size[0] - crop_width) / 2
+                top = (img.size[1] - crop_height) / 2
+                box = (left, top, left + crop_width, top + crop_height)
+                rendered = img.resize((width, height), Image.LANCZOS, box=box, reducing_gap=3.0)
+
+        # Concurrent first renders of one image each write their own file
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{render_path.stem}_", suffix=".tmp",
+                                        dir=self.render_cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                rendered.save(f, 'JPEG', quality=92)
+            os.replace(tmp_path, render_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.cleanup_render_cache()
+        return str(render_path)
 
     def set_wallpaper(self, image_path):
         """Set the Windows wallpaper"""
         try:
+            try:
+                image_path = self.render_for_screen(image_path)
+            except Exception as e:
+                self.logger.error(f"Error rendering wallpaper, using original: {e}")
+
             abs_path = str(Path(image_path).resolve())
-            result = ctypes.windll.user32.SystemParametersInfoW(
-                self.SPI_SETDESKWALLPAPER, 
-                0, 
-                abs_path, 
-                self.SPIF_UPDATEINIFILE | self.SPIF_SENDCHANGE
-            )
-            
-            if not result:
-                raise Exception("SystemParametersInfoW returned 0")
-            
+            self.apply_wallpaper(abs_path)
             self.logger.info(f"Wallpaper set successfully: {abs_path}")
             
         except Exception as e:
             self.logger.error(f"Error setting wallpaper: {e}")
             raise
 
+    def apply_wallpaper(self, abs_path):
+        """Hand an image file to Windows as the desktop wallpaper"""
+        result = ctypes.windll.user32.SystemParametersInfoW(
+            self.SPI_SETDESKWALLPAPER, 
+            0, 
+            abs_path, 
+            self.SPIF_UPDATEINIFILE | self.SPIF_SENDCHANGE
+        )
+        
+        if not result:
+            raise Exception("SystemParametersInfoW returned 0")
+
     def cleanup_old_wallpapers(self, max_files=10):
         """Keep only the most recent wallpapers"""
         try:
@@ -683,13 +1032,37 @@ class WallpaperSlideshow:
             for wallpaper in wallpapers[max_files:]:
                 wallpaper.unlink()
                 self.logger.info(f"Cleaned up old wallpaper: {wallpaper}")
+
+            # Temporary files left behind by a crash mid-download
+            for tmp_file in self.download_dir.glob(".wallpaper_*.tmp"):
+                if time.time() - tmp_file.stat().st_mtime > 3600:
+                    tmp_file.unlink()
         except Exception as e:
             self.logger.error(f"Error cleaning up wallpapers: {e}")
 
+    def cleanup_render_cache(self, max_files=50):
+        """Keep only the most recently used screen renders"""
+        try:
+            renders = list(self.render_cache_dir.glob("*.jpg"))
+            renders.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+
+            for render in renders[max_files:]:
+                render.unlink()
+
+            # Temporary files left behind by a crash mid-render
+            for tmp_file in self.render_cache_dir.glob(".*.tmp"):
+                if time.time() - tmp_file.stat().st_mtime > 3600:
+                    tmp_file.unlink()
+        except Exception as e:
+            self.logger.error(f"Error cleaning up render cache: {e}")
+
     def quit_app(self):
         """Cleanup and quit the application"""
         try:
             self.running = False
+            if self.status_timer is not None and threading.current_thread() is self.ui_thread:
+                self.button_window.after_cancel(self.status_timer)
+                self.status_timer = None
             if self.icon:
                 self.icon.stop()
             if self.button_window:
@@ -709,12 +1082,17 @@ class WallpaperSlideshow:
             while self.running:
                 try:
                     if self.timer_active:  # Only change wallpaper if timer is active
-                        self.force_new_wallpaper()
+                        self.force_new_wallpaper(background=True)
+                    # Pick up new favorites, Spotlight images and downloads
+                    self.refresh_feature_index()
                     time.sleep(interval_minutes * 10)
                 except Exception as e:
                     self.logger.error(f"Error in auto_changer: {e}")
                     time.sleep(60)
         
+        # Build the feature index without holding up the UI
+        self.refresh_feature_index_in_background()
+
         # Start the automatic changer thread
         changer_thread = threading.Thread(target=auto_changer, daemon=True)
         changer_thread.start()
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+
+class RequestBudget:
+    """Tracks the Pexels API quota and decides when a request may be made.
+
+    The monthly quota comes from the X-Ratelimit-* response headers; the
+    hourly limit is not reported by the API, so it is counted locally.
+    Interactive requests may use the whole quota, while background requests
+    leave a reserve and are spread evenly over the remaining quota window.
+    State is saved to disk so the budget survives restarts.
+    """
+
+    def __init__(self, state_path="pexels_budget.json", hourly_limit=200,
+                 hourly_reserve=20, monthly_reserve=100):
+        self.state_path = Path(state_path)
+        self.hourly_limit = hourly_limit
+        self.hourly_reserve = hourly_reserve
+        self.monthly_reserve = monthly_reserve
+        self.lock = threading.Lock()
+
+        self.limit = None        # Monthly limit, once the API has told us
+        self.remaining = None    # Requests left in the current period
+        self.reset = None        # UNIX time at which the period rolls over
+        self.recent = []         # Times of the requests made in the last hour
+        self.last_background = 0.0
+        self.blocked_until = 0.0  # Set by a 429 response, independent of the monthly period
+        self.load()
+
+    def load(self):
+        """Load the saved budget state, if any"""
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.limit = state.get('limit')
+        self.remaining = state.get('remaining')
+        self.reset = state.get('reset')
+        self.recent = state.get('recent', [])
+        self.last_background = state.get('last_background', 0.0)
+        self.blocked_until = state.get('blocked_until', 0.0)
+
+    def save(self):
+        """Write the budget state to disk atomically"""
+        state = {
+            'limit': self.limit,
+            'remaining': self.remaining,
+            'reset': self.reset,
+            'recent': self.recent,
+            'last_background': self.last_background,
+            'blocked_until': self.blocked_until,
+        }
+        tmp_path = self.state_path.with_name(f".{self.state_path.name}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _refresh(self, now):
+        """Forget requests older than an hour and roll over an expired period"""
+        self.recent = [t for t in self.recent if now - t < 3600]
+        if self.reset is not None and now >= self.reset:
+            self.remaining = self.limit
+            self.reset = None
+
+    def allow(self, interactive=False, now=None):
+        """Return True if a request may be made now"""
+        now = time.time() if now is None else now
+        with self.lock:
+            self._refresh(now)
+
+            if now < self.blocked_until:
+                return False
+            if len(self.recent) >= self.hourly_limit:
+                return False
+            if self.remaining is not None and self.remaining <= 0:
+                return False
+            if interactive:
+                return True
+
+            # Background requests leave headroom for the user
+            hourly_left = self.hourly_limit - self.hourly_reserve - len(self.recent)
+            if hourly_left <= 0:
+                return False
+            min_interval = 3600 / (self.hourly_limit - self.hourly_reserve)
+
+            if self.remaining is not None:
+                spare = self.remaining - self.monthly_reserve
+                if spare <= 0:
+                    return False
+                if self.reset is not None:
+                    # Spread what is left evenly until the period resets
+                    min_interval = max(min_interval, (self.reset - now) / spare)
+
+            return now - self.last_background >= min_interval
+
+    def record(self, response=None, interactive=False, now=None):
+        """Record a request that was made and the quota headers it returned"""
+        now = time.time() if now is None else now
+        with self.lock:
+            self._refresh(now)
+            self.recent.append(now)
+            if not interactive:
+                self.last_background = now
+
+            headers = response.headers if response is not None else {}
+            try:
+                if 'X-Ratelimit-Limit' in headers:
+                    self.limit = int(headers['X-Ratelimit-Limit'])
+                if 'X-Ratelimit-Remaining' in headers:
+                    self.remaining = int(headers['X-Ratelimit-Remaining'])
+                if 'X-Ratelimit-Reset' in headers:
+                    self.reset = float(headers['X-Ratelimit-Reset'])
+            except ValueError:
+                pass
+
+            if response is not None and response.status_code == 429:
+                # Throttled, most likely by the hourly limit we only estimate
+                # locally: back off for as long as the server asks, or an hour.
+                # The monthly remaining/reset are left to the headers.
+                try:
+                    retry_after = float(headers.get('Retry-After', 3600))
+                except ValueError:
+                    retry_after = 3600
+                self.blocked_until = now + retry_after
+            elif self.remaining is not None and 'X-Ratelimit-Remaining' not in headers:
+                self.remaining = max(0, self.remaining - 1)
+
+            try:
+                self.save()
+            except OSError:
+                pass
+
+    def status(self, now=None):
+        """Return a short human-readable summary of the budget"""
+        now = time.time() if now is None else now
+        with self.lock:
+            self._refresh(now)
+            remaining = "unknown" if self.remaining is None else self.remaining
+            return f"{remaining} requests left this period, {len(self.recent)}/{self.hourly_limit} used this hour"
@@ -0,0 +1,139 @@
+import os
+import math
+import struct
+import logging
+import tempfile
+import hashlib
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+class SeenSet:
+    """Persistent Bloom filter of things we have already seen.
+
+    Memory use is fixed by the capacity and error rate chosen up front, no
+    matter how many items are added. Each downloaded photo adds two keys (its
+    Pexels ID and its content hash), so the default capacity of two million
+    keys covers a million downloads at 0.1% (about 3.6 MB).
+
+    When a filter fills up it becomes the previous generation and a fresh one
+    is started. Lookups check both, so the newest one to two million keys are
+    always remembered while memory stays bounded at two filters, and the
+    false-positive rate never climbs past the design rate of each filter.
+    Membership tests may give false positives but never false negatives for
+    keys in either generation.
+    """
+
+    HEADER = struct.Struct('<4sQQQQ')
+    MAGIC = b'SEE2'
+    OLD_HEADER = struct.Struct('<4sQQQ')
+    OLD_MAGIC = b'SEEN'
+
+    def __init__(self, path="seen_set.bin", capacity=2_000_000, error_rate=0.001):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.previous_bits = None  # The last full generation, if any
+        self.load()
+
+    def __len__(self):
+        return self.count
+
+    def _positions(self, key):
+        """Bit positions for a key, using double hashing on one digest"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        h2 |= 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    @staticmethod
+    def _has(bits, positions):
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in positions)
+
+    def __contains__(self, key):
+        positions = self._positions(key)
+        with self.lock:
+            if self._has(self.bits, positions):
+                return True
+            return self.previous_bits is not None and self._has(self.previous_bits, positions)
+
+    def add(self, key):
+        """Add a key; returns False if it was (probably) already present"""
+        positions = self._positions(key)
+        with self.lock:
+            # Always set the key in the current generation, so it outlives the
+            # previous one even if it was already there
+            in_previous = self.previous_bits is not None and self._has(self.previous_bits, positions)
+            new = False
+            for pos in positions:
+                mask = 1 << (pos & 7)
+                if not self.bits[pos >> 3] & mask:
+                    self.bits[pos >> 3] |= mask
+                    new = True
+            if new:
+                self.count += 1
+                if self.count >= self.capacity:
+                    # Full: keep it as the previous generation and start afresh
+                    logger.info(f"Seen-set reached {self.count} entries, starting a new generation")
+                    self.previous_bits = self.bits
+                    self.bits = bytearray(len(self.previous_bits))
+                    self.count = 0
+            return new and not in_previous
+
+    def load(self):
+        """Load the filter from disk if it was saved with the same size"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+
+        size = len(self.bits)
+        try:
+            if data[:4] == self.MAGIC:
+                magic, num_bits, num_hashes, count, generations = self.HEADER.unpack_from(data)
+                offset = self.HEADER.size
+            elif data[:4] == self.OLD_MAGIC:
+                # Single-generation files written before generations existed
+                magic, num_bits, num_hashes, count = self.OLD_HEADER.unpack_from(data)
+                generations = 1
+                offset = self.OLD_HEADER.size
+            else:
+                return
+        except struct.error:
+            return
+        if num_bits != self.num_bits or num_hashes != self.num_hashes:
+            return
+        if len(data) != offset + size * generations or generations not in (1, 2):
+            return
+
+        self.bits = bytearray(data[offset:offset + size])
+        self.count = count
+        if generations == 2:
+            self.previous_bits = bytearray(data[offset + size:])
+
+    def save(self):
+        """Write the filter to disk atomically"""
+        with self.lock:
+            # A unique temporary name per save, moved into place under the lock,
+            # so concurrent savers never swap in each other's partial files
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}_", suffix=".tmp",
+                                            dir=self.path.parent)
+            try:
+                generations = 1 if self.previous_bits is None else 2
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(self.HEADER.pack(self.MAGIC, self.num_bits, self.num_hashes,
+                                             self.count, generations))
+                    f.write(self.bits)
+                    if self.previous_bits is not None:
+                        f.write(self.previous_bits)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
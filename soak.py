@@ -0,0 +1,334 @@
+"""Long-run soak test for WallpaperSlideshow.
+
+Drives thousands of change/favorite/status cycles against a local fake
+Pexels server and a no-op wallpaper sink, sampling RSS, thread count and
+tracemalloc statistics along the way. Exits with status 1 if memory or
+threads grow past the given thresholds after the warm-up phase, or if the
+status label is touched from a thread other than the UI thread.
+
+As in run(), the main thread runs the UI loop while a worker thread makes
+the timed background changes; button actions are posted to the UI thread.
+The UI is a withdrawn Tk window with the real status label, or a headless
+stand-in with the same after() contract when there is no display.
+
+    python soak.py --cycles 5000 --sample-every 250
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+import threading
+import tracemalloc
+import time
+from io import BytesIO
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from PIL import Image
+import tkinter as tk
+
+try:
+    import psutil
+except ImportError:  # RSS is then read from /proc where available
+    psutil = None
+
+from myndasyning import WallpaperSlideshow
+from pexels_budget import RequestBudget
+
+def make_image_pool(count=8, size=(1600, 1000)):
+    """Encode a few JPEGs to serve; each response gets a unique suffix"""
+    pool = []
+    for _ in range(count):
+        color = tuple(random.randint(0, 255) for _ in range(3))
+        buffer = BytesIO()
+        Image.new('RGB', size, color).save(buffer, 'JPEG', quality=85)
+        pool.append(buffer.getvalue())
+    return pool
+
+class FakePexelsHandler(BaseHTTPRequestHandler):
+    """Serves /v1/search and /img/<id>.jpg like a tiny Pexels"""
+
+    image_pool = []
+    next_id = 0
+    id_lock = threading.Lock()
+    offline = False  # When set, every request fails as if Pexels were down
+
+    def do_GET(self):
+        if self.offline:
+            self.send_error(503)
+            return
+        url = urlparse(self.path)
+        if url.path == "/v1/search":
+            per_page = int(parse_qs(url.query).get('per_page', ['1'])[0])
+            with self.id_lock:
+                first_id = FakePexelsHandler.next_id
+                FakePexelsHandler.next_id += per_page
+            host = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+            photos = [{
+                'id': photo_id,
+                'photographer': "Soak",
+                'src': {'original': f"{host}/img/{photo_id}.jpg"},
+            } for photo_id in range(first_id, first_id + per_page)]
+            body = json.dumps({'photos': photos, 'total_results': 100000}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('X-Ratelimit-Limit', '1000000000')
+            self.send_header('X-Ratelimit-Remaining', '1000000000')
+            self.send_header('X-Ratelimit-Reset', str(int(time.time()) + 30 * 86400))
+        elif url.path.startswith("/img/"):
+            photo_id = int(url.path[len("/img/"):-len(".jpg")])
+            # Bytes after the JPEG end marker are ignored by decoders but make
+            # every image's content hash unique
+            body = self.image_pool[photo_id % len(self.image_pool)] + str(photo_id).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+        else:
+            self.send_error(404)
+            return
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class HeadlessWindow:
+    """Stands in for the Tk root without a display.
+
+    Callbacks queued with after() run on the thread inside mainloop(), from
+    any thread that queues them, like Tk's event loop.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.jobs = {}  # after() id -> (due time, callback, args)
+        self.next_id = 0
+        self.running = False
+
+    def after(self, delay_ms, callback, *args):
+        with self.condition:
+            self.next_id += 1
+            job_id = f"after#{self.next_id}"
+            self.jobs[job_id] = (time.monotonic() + delay_ms / 1000, callback, args)
+            self.condition.notify()
+        return job_id
+
+    def after_cancel(self, job_id):
+        with self.condition:
+            self.jobs.pop(job_id, None)
+
+    def update_idletasks(self):
+        pass
+
+    def mainloop(self):
+        self.running = True
+        while self.running:
+            with self.condition:
+                now = time.monotonic()
+                due = sorted((job for job in self.jobs.items() if job[1][0] <= now),
+                             key=lambda job: job[1][0])
+                for job_id, _ in due:
+                    del self.jobs[job_id]
+                if not due:
+                    next_due = min((job[0] for job in self.jobs.values()), default=now + 1)
+                    self.condition.wait(max(0.0, next_due - now))
+                    continue
+            for _, (_, callback, args) in due:
+                callback(*args)
+
+    def quit(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify()
+
+class HeadlessLabel:
+    """Records the status label's options instead of drawing them"""
+
+    def __init__(self):
+        self.options = {}
+
+    def config(self, **options):
+        self.options.update(options)
+
+class SoakSlideshow(WallpaperSlideshow):
+    """A slideshow with only a status label, whose wallpaper sink does nothing"""
+
+    foreign_status_updates = 0  # Status label changes made off the UI thread
+
+    def init_ui(self):
+        try:
+            self.button_window = tk.Tk()
+            self.button_window.withdraw()
+            label = tk.Label(self.button_window)
+        except tk.TclError:
+            self.button_window = HeadlessWindow()
+            label = HeadlessLabel()
+
+        # Count any label change that bypasses the UI thread
+        config = label.config
+        def checked_config(**options):
+            if threading.current_thread() is not self.ui_thread:
+                self.foreign_status_updates += 1
+            config(**options)
+        label.config = checked_config
+        self.status_label = label
+
+    def get_screen_size(self):
+        return 1280, 720
+
+    def apply_wallpaper(self, abs_path):
+        pass
+
+def current_rss():
+    """Resident set size of this process in bytes, or None if unknown"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def run_on_ui_thread(slideshow, action):
+    """Run an action on the UI thread, as a button click would, and wait for it"""
+    done = threading.Event()
+    def run():
+        try:
+            action()
+        finally:
+            done.set()
+    slideshow.button_window.after(0, run)
+    done.wait()
+
+def take_sample(cycle, baseline_snapshot):
+    """Collect RSS, thread count, traced memory and the top allocation growth"""
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    top = snapshot.compare_to(baseline_snapshot, 'lineno')[:5] if baseline_snapshot else []
+    return {
+        'cycle': cycle,
+        'rss': current_rss(),
+        'threads': threading.active_count(),
+        'traced': tracemalloc.get_traced_memory()[0],
+        'top': top,
+        'snapshot': snapshot,
+    }
+
+def print_sample(sample):
+    rss = "n/a" if sample['rss'] is None else f"{sample['rss'] / 2**20:.1f} MB"
+    print(f"cycle {sample['cycle']:>6}: rss {rss}, threads {sample['threads']}, "
+          f"traced {sample['traced'] / 2**20:.1f} MB")
+    for stat in sample['top']:
+        print(f"    {stat}")
+
+def run_soak(cycles=5000, sample_every=250, warmup=500, max_rss_growth_mb=50,
+             max_traced_growth_mb=20, max_thread_growth=5):
+    """Run the soak test and return True if it stayed within the thresholds"""
+    FakePexelsHandler.image_pool = make_image_pool()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakePexelsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # The slideshow keeps its folders relative to the working directory
+    original_cwd = os.getcwd()
+    workdir = tempfile.TemporaryDirectory(prefix="myndasyning_soak_")
+    os.chdir(workdir.name)
+    print(f"Soak test in {workdir.name} ({cycles} cycles)")
+
+    slideshow = None
+    tracemalloc.start(10)
+    baseline = None
+    last = None
+    try:
+        slideshow = SoakSlideshow("soak-key")
+        slideshow.logger.setLevel("WARNING")
+        slideshow.pexels_api_url = f"http://127.0.0.1:{server.server_address[1]}/v1/search"
+        slideshow.request_budget = RequestBudget("pexels_budget.json", hourly_limit=10**9,
+                                                 hourly_reserve=0, monthly_reserve=0)
+        print(f"UI: {type(slideshow.button_window).__name__}")
+
+        def changer():
+            # Plays the part of run()'s auto_changer, plus the user's clicks
+            nonlocal baseline, last
+            try:
+                for cycle in range(1, cycles + 1):
+                    action = random.random()
+                    if action < 0.4:
+                        slideshow.force_new_wallpaper(background=True)
+                    elif action < 0.5:
+                        # Pexels is down: exercise the fallback to local images
+                        FakePexelsHandler.offline = True
+                        try:
+                            slideshow.force_new_wallpaper(background=True)
+                        finally:
+                            FakePexelsHandler.offline = False
+                    elif action < 0.6:
+                        run_on_ui_thread(slideshow, slideshow.force_new_wallpaper)
+                    elif action < 0.7:
+                        run_on_ui_thread(slideshow, slideshow.save_to_favorites)
+                    elif action < 0.8:
+                        run_on_ui_thread(slideshow, slideshow.more_like_current)
+                    elif action < 0.85:
+                        run_on_ui_thread(slideshow, slideshow.toggle_mood_rotation)
+                    else:
+                        slideshow.update_status(slideshow.request_budget.status())
+                        slideshow.reset_status_later()
+
+                    if cycle == warmup or (cycle > warmup and cycle % sample_every == 0) or cycle == cycles:
+                        last = take_sample(cycle, baseline['snapshot'] if baseline else None)
+                        if baseline is None:
+                            baseline = last
+                        print_sample(last)
+            finally:
+                slideshow.button_window.after(0, slideshow.button_window.quit)
+
+        changer_thread = threading.Thread(target=changer, daemon=True)
+        changer_thread.start()
+        slideshow.button_window.mainloop()
+        changer_thread.join()
+    finally:
+        if slideshow is not None:
+            slideshow.quit_app()
+        server.shutdown()
+        tracemalloc.stop()
+        os.chdir(original_cwd)
+        workdir.cleanup()
+
+    failures = []
+    if slideshow.foreign_status_updates:
+        failures.append(f"Status label changed {slideshow.foreign_status_updates} times off the UI thread")
+    if baseline is None or last is baseline:
+        print("Not enough cycles after warm-up to measure growth")
+    else:
+        if baseline['rss'] is not None and last['rss'] is not None:
+            growth = (last['rss'] - baseline['rss']) / 2**20
+            if growth > max_rss_growth_mb:
+                failures.append(f"RSS grew by {growth:.1f} MB (limit {max_rss_growth_mb} MB)")
+        growth = (last['traced'] - baseline['traced']) / 2**20
+        if growth > max_traced_growth_mb:
+            failures.append(f"Traced memory grew by {growth:.1f} MB (limit {max_traced_growth_mb} MB)")
+        growth = last['threads'] - baseline['threads']
+        if growth > max_thread_growth:
+            failures.append(f"Thread count grew by {growth} (limit {max_thread_growth})")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("Soak test passed")
+    return not failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Long-run soak test for the wallpaper slideshow")
+    parser.add_argument("--cycles", type=int, default=5000)
+    parser.add_argument("--sample-every", type=int, default=250)
+    parser.add_argument("--warmup", type=int, default=500, help="cycles before the baseline sample")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=50)
+    parser.add_argument("--max-traced-growth-mb", type=float, default=20)
+    parser.add_argument("--max-thread-growth", type=int, default=5)
+    args = parser.parse_args()
+
+    passed = run_soak(args.cycles, args.sample_every, args.warmup, args.max_rss_growth_mb,
+                      args.max_traced_growth_mb, args.max_thread_growth)
+    sys.exit(0 if passed else 1)